@@ -1,5 +1,6 @@
 from __future__ import annotations
 import time, json, threading, sqlite3, os, logging
+from contextlib import contextmanager
 from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from backend.db_schema import ensure_schema
@@ -88,6 +89,7 @@ class Journal:
         self._buf = []
         self._lock = threading.Lock()
         self._last_flush = time.time()
+        self.hold = False  # set by RaceEngine.batch(): flush on batch_max only
         self._ensure_schema()
         self._white_window_begun: bool = False
 
@@ -96,23 +98,24 @@ class Journal:
         if not self.enabled: return
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         con = sqlite3.connect(self.db_path)
-        cur = con.cursor()
-        cur.execute("""CREATE TABLE IF NOT EXISTS race_events(
+        # one script: parsed and committed in a single round trip
+        con.executescript("""
+        CREATE TABLE IF NOT EXISTS race_events(
             id INTEGER PRIMARY KEY,
             race_id INTEGER NOT NULL,
             ts_utc INTEGER NOT NULL,
             clock_ms INTEGER NOT NULL,
             type TEXT NOT NULL,
             payload_json TEXT NOT NULL
-        )""")
-        cur.execute("""CREATE TABLE IF NOT EXISTS race_checkpoints(
+        );
+        CREATE TABLE IF NOT EXISTS race_checkpoints(
             id INTEGER PRIMARY KEY,
             race_id INTEGER NOT NULL,
             ts_utc INTEGER NOT NULL,
             clock_ms INTEGER NOT NULL,
             snapshot_json TEXT NOT NULL
-        )""")
-        con.commit()
+        );
+        """)
         con.close()
 
     def put(self, row:Tuple[int,int,int,str,dict]):
@@ -121,7 +124,7 @@ class Journal:
         with self._lock:
             self._buf.append(row)
             now = time.time()
-            if len(self._buf) >= self.batch_max or (now - self._last_flush) * 1000 >= self.batch_ms:
+            if len(self._buf) >= self.batch_max or (not self.hold and (now - self._last_flush) * 1000 >= self.batch_ms):
                 self._flush_locked()
                 self._last_flush = now
 
@@ -204,6 +207,12 @@ class RaceEngine:
 
         # state
         self._lock = threading.RLock()
+        self._batch_depth = 0
+        # standings rows are rebuilt only when entrant state changes: every
+        # mutation bumps _state_ver (see _touch) and snapshot() reuses rows
+        # built at the same version
+        self._state_ver = 0
+        self._standings_cache: Tuple[Any, List[Dict]] = (None, [])
         self.reset()
 
         # background checkpoint timer
@@ -212,6 +221,7 @@ class RaceEngine:
     # ---------- lifecycle ----------
     def reset(self):
         with self._lock:
+            self._touch()
             self.flag: str = "pre"
             self.race_id: Optional[int] = None
             self.race_type: Optional[str] = None
@@ -347,6 +357,7 @@ class RaceEngine:
                 if ent.enabled and ent.tag:
                     self.tag_to_eid[ent.tag] = ent.entrant_id
 
+            self._touch()
             self._emit_flag_change("pre")
             return self.snapshot()
 
@@ -527,6 +538,38 @@ class RaceEngine:
                     self.clock_start_monotonic = None
                     self.clock_ms_frozen = self.clock_ms
 
+    @contextmanager
+    def batch(self):
+        """
+        Hold the engine lock across a burst of ingest_pass calls (bulk import,
+        replay, tests). Timed journal flushes and checkpoints wait until the
+        outermost batch exits; nested batches are fine.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            self.journal.hold = True
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.journal.hold = False
+            # normal exit only, so a failing flush can't mask the body's exception;
+            # after an error the held entries go out with the next timed flush
+            if self._batch_depth == 0:
+                self.journal.force_flush()
+                self._maybe_checkpoint()
+
+    def set_virtual_elapsed_ms(self, ms: int) -> None:
+        """
+        Jump the race clock to `ms` elapsed (tests, replays). A running clock
+        keeps ticking from here; limits/white are evaluated on the next update.
+        """
+        with self._lock:
+            self.clock_ms = int(ms)
+            if self.running:
+                self.clock_start_monotonic = time.perf_counter()
+
     # ---------- passes & pits ----------
     def ingest_pass(self, tag:str, ts_ns:Optional[int]=None, source:str="track", device_id:Optional[str]=None) -> dict:
         tag = str(tag).strip()
@@ -558,6 +601,7 @@ class RaceEngine:
                     self.entrants[new_id] = ent
                     self.tag_to_eid[tag] = new_id
                     self._lap_history[new_id] = []
+                    self._touch()
                     eid = new_id
                 else:
                     # ignore unknown
@@ -583,6 +627,7 @@ class RaceEngine:
                         ent.last_pit_s = dur_ms / 1000.0
                         ent.pit_count += 1
                         ent.pit_open_at_ms = None
+                        self._touch()
                 return {"ok": True, "entrant_id": eid, "lap_added": False, "lap_time_s": None, "reason": "pit_event"}
 
             # track (lap) logic - checkered behavior depends on soft_end
@@ -625,6 +670,7 @@ class RaceEngine:
                     ent.pace_buf = ent.pace_buf[-5:]
                 lap_ms = max(0, self.clock_ms - prev_mark)
                 self._lap_history.setdefault(eid, []).append(int(lap_ms))
+                self._touch()
                 self._maybe_auto_white_lap()
                 lap_added = True
                 lap_time_s = round(delta_s, 3)
@@ -637,6 +683,7 @@ class RaceEngine:
                     # Mark as completed during soft_end to prevent further lap increments
                     if self.soft_end:
                         ent.soft_end_completed = True
+                    self._touch()
                 
                 # Lap-limit enforcement: CHECKERED when leader reaches lap count
                 if (not self._limit_reached
@@ -649,6 +696,7 @@ class RaceEngine:
                         ent.finish_order = self._finish_order_counter
                         if self.soft_end:
                             ent.soft_end_completed = True
+                        self._touch()
                     # Always throw CHECKERED at lap limit (triggers lights/sounds)
                     self._auto_checkered("lap_limit")
             else:
@@ -656,7 +704,8 @@ class RaceEngine:
                 ent._last_hit_ms = self.clock_ms
 
             self._last_update_utc = UTC_MS()
-            self._maybe_checkpoint()
+            if not self._batch_depth:
+                self._maybe_checkpoint()
             return {"ok": True, "entrant_id": eid, "lap_added": lap_added, "lap_time_s": lap_time_s, "reason": None}
 
     def scratch_entrant_best(self, entrant_id: int) -> dict:
@@ -692,6 +741,7 @@ class RaceEngine:
             # Update entrant's best to next-best valid time (or None if no valid times left)
             previous_best = min(valid_times) if valid_times else None
             ent.best_s = previous_best
+            self._touch()
             
             self._last_update_utc = UTC_MS()
             
@@ -835,6 +885,7 @@ class RaceEngine:
             ent = self.entrants.get(int(entrant_id))
             if not ent: raise KeyError("entrant not found")
             ent.enabled = bool(enabled)
+            self._touch()
             # rebuild tag map simply
             self._rebuild_tag_index()
             self._last_update_utc = UTC_MS()
@@ -850,6 +901,7 @@ class RaceEngine:
             ent = self.entrants.get(int(entrant_id))
             if not ent: raise KeyError("entrant not found")
             ent.status = s
+            self._touch()
             self._last_update_utc = UTC_MS()
             self.journal.put((self.race_id or 0, self._last_update_utc, self.clock_ms, "entrant_status",
                               {"entrant_id": ent.entrant_id, "status": ent.status}))
@@ -860,12 +912,17 @@ class RaceEngine:
             ent = self.entrants.get(int(entrant_id))
             if not ent: raise KeyError("entrant not found")
             ent.tag = (str(tag).strip() if tag else None)
+            self._touch()
             self._rebuild_tag_index()
             self._last_update_utc = UTC_MS()
             self.journal.put((self.race_id or 0, self._last_update_utc, self.clock_ms, "assign_tag",
                               {"entrant_id": ent.entrant_id, "tag": ent.tag}))
             return self.snapshot()
 
+    def _touch(self):
+        """Mark entrant/standings state as changed (invalidates cached standings)."""
+        self._state_ver += 1
+
     def _rebuild_tag_index(self):
         self.tag_to_eid = {}
         for e in self.entrants.values():
@@ -932,29 +989,13 @@ class RaceEngine:
         with self._lock:
             self._last_update_utc = UTC_MS()
 
-            # ordering
-            entrants = list(self.entrants.values())
-
-            # sort: laps desc → finish_order asc (when soft_end) → best asc → last asc → entrant_id asc
-            def sort_key(e: Entrant):
-                best = e.best_s if e.best_s is not None else 9e9
-                last = e.last_s if e.last_s is not None else 9e9
-                # For races with soft_end, use finish order as primary tiebreaker after lap count
-                # Lower finish_order = crossed S/F first after limit reached = better position
-                finish = e.finish_order if e.finish_order is not None else 9e9
-                if self.soft_end:
-                    # Both time and lap races use finish_order when soft_end is enabled
-                    return (-e.laps, finish, best, last, e.entrant_id)
-                else:
-                    # Hard-end races use traditional sort (no finish order)
-                    return (-e.laps, best, last, e.entrant_id)
-
-            entrants.sort(key=sort_key)
-
-            leader_best = entrants[0].best_s if entrants else None
-            leader_laps = entrants[0].laps if entrants else 0
-
-            rows = [e.as_snapshot(leader_best, leader_laps) for e in entrants if e.enabled]
+            # standings depend only on entrant state and the soft_end tiebreak;
+            # clock/flag/limit fields below are rebuilt on every call
+            key = (self._state_ver, self.soft_end)
+            cached_key, rows = self._standings_cache
+            if cached_key != key:
+                rows = self._build_standings()
+                self._standings_cache = (key, rows)
 
             snap = {
                 "flag": self.flag,
@@ -964,7 +1005,7 @@ class RaceEngine:
                 "session_label": self.session_label,
                 "clock_ms": self.clock_ms,
                 "running": self.running,
-                "standings": rows,
+                "standings": list(rows),  # callers may reorder; the row dicts are shared
                 "last_update_utc": self._last_update_utc,
                 "source": "engine",
                 "sim": self.sim_active,
@@ -995,6 +1036,32 @@ class RaceEngine:
             return snap
 
 
+    def _build_standings(self) -> List[Dict]:
+        """Sorted snapshot rows for enabled entrants; caller holds the lock."""
+        entrants = list(self.entrants.values())
+
+        # sort: laps desc → finish_order asc (when soft_end) → best asc → last asc → entrant_id asc
+        def sort_key(e: Entrant):
+            best = e.best_s if e.best_s is not None else 9e9
+            last = e.last_s if e.last_s is not None else 9e9
+            # For races with soft_end, use finish order as primary tiebreaker after lap count
+            # Lower finish_order = crossed S/F first after limit reached = better position
+            finish = e.finish_order if e.finish_order is not None else 9e9
+            if self.soft_end:
+                # Both time and lap races use finish_order when soft_end is enabled
+                return (-e.laps, finish, best, last, e.entrant_id)
+            else:
+                # Hard-end races use traditional sort (no finish order)
+                return (-e.laps, best, last, e.entrant_id)
+
+        entrants.sort(key=sort_key)
+
+        leader_best = entrants[0].best_s if entrants else None
+        leader_laps = entrants[0].laps if entrants else 0
+
+        rows = [e.as_snapshot(leader_best, leader_laps) for e in entrants if e.enabled]
+        return rows
+
     def _maybe_checkpoint(self):
         now = time.time()
         if (now - self._last_checkpoint) >= self.checkpoint_s:
@@ -15,34 +15,125 @@ UI prompt stays visible: "Enter command >".
 from __future__ import annotations
 
 import argparse
+import atexit
 import dataclasses
-import hashlib
+import heapq
+import io
 import json
 import math
 import os
+import queue
 import random
+import select
+import shutil
 import signal
 import sqlite3
 import sys
+import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+if os.name == "nt":
+    import ctypes
+    import msvcrt
+else:
+    import termios
+    import tty
+
+try:
+    import numpy as np  # optional: batches lap-time sampling
+except ImportError:
+    np = None
+
 # -------------------- defaults --------------------
 
 DEFAULT_DB_PATH = Path("./laps.sqlite")
 DEFAULT_RACE_ID = 99
+RENDER_INTERVAL_S = 0.5
+TICK_S = 0.05
+STATE_INTERVAL_S = 0.1     # race_state row refresh (the UI polls at ~1 Hz)
+FLUSH_INTERVAL_S = 0.25     # queued passes + state are committed together at this cadence (no writer thread)
+WRITER_QUEUE_MAX = 1024    # writer backlog before the sim loop blocks (backpressure, never drops)
+WRITER_BATCH = 256         # most queued writes folded into one transaction
+WRITER_LINGER_S = 0.01     # how long the writer waits for more work before committing
+WRITER_PUT_WAIT_S = 0.25   # a blocked producer re-checks the writer this often
+SAMPLE_POOL_SIZE = 256
+MIN_LAP_S = 3.0
+UNSCHEDULED = 1 << 62       # next-pass sentinel: sorts after any real sim time
+
+# -------------------- view layout --------------------
+
+_VIEW_HEADER = (
+    "\n"
+    "Pos | Car | Racer Name                 | Laps | Last(s) | Best(s)\n"
+    "----+-----+----------------------------+------+---------+--------\n"
+)
+_VIEW_FOOTER = (
+    "\n"
+    "Commands: s=start  p=pause  t=toggle  n=next  +=faster  -=slower  x=pre  q=quit\n"
+    "Flags:    g=green  y=yellow  r=red  w=white  b=blue  c=checkered\n"
+)
+_ROW_FMT = "{:3d} | {:>3s} | {:<26} | {:4d} | {:>7} | {:>6}\n".format
 
 # -------------------- util --------------------
 
 def now_ms() -> int:
-    return int(time.time() * 1000)
+    return time.time_ns() // 1_000_000
+
+_vt_ok: Optional[bool] = None
+
+def vt_enabled() -> bool:
+    """True if stdout interprets ANSI escapes (POSIX always; Win10+ once VT mode is switched on)."""
+    global _vt_ok
+    if _vt_ok is None:
+        _vt_ok = True
+        if os.name == "nt":
+            k32 = ctypes.windll.kernel32
+            handle = k32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+            mode = ctypes.c_uint32()
+            _vt_ok = bool(k32.GetConsoleMode(handle, ctypes.byref(mode))
+                          and k32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    return _vt_ok
 
 def clear_screen():
+    if not vt_enabled():
+        os.system("cls")    # legacy console without VT support
+        return
     sys.stdout.write("\033[2J\033[H")
     sys.stdout.flush()
 
+def fits_screen(lines: List[str]) -> bool:
+    """True if `lines`, as wrapped by the terminal, plus the prompt below them fit without scrolling."""
+    # cursor addressing only reaches the visible rows; once a taller frame has
+    # scrolled, row 1 is no longer the top of the view
+    cols, rows = shutil.get_terminal_size()
+    return sum(max(1, math.ceil(len(line) / cols)) for line in lines) < rows
+
+def repaint_in_place(text: str):
+    if not vt_enabled() or not fits_screen(text.splitlines()):
+        clear_screen()
+        sys.stdout.write(text)
+        return
+    # home the cursor and overwrite: erase each line's tail and anything below the
+    # view, so there is no full-screen clear (and no flicker) between frames
+    sys.stdout.write("\033[H" + text.replace("\n", "\033[K\n") + "\033[J")
+
+def repaint_changed(old: List[str], new: List[str]):
+    # rewrite only the screen rows that differ from the previous frame; between
+    # renders usually just the clock line and a car or two have moved
+    if not vt_enabled():
+        repaint_in_place("\n".join(new) + "\n")
+        return
+    out = []
+    for row, line in enumerate(new, start=1):
+        if row > len(old) or old[row - 1] != line:
+            out.append(f"\033[{row};1H{line}\033[K")
+    # park on the row after the view and drop whatever a taller frame left below
+    out.append(f"\033[{len(new) + 1};1H\033[J")
+    sys.stdout.write("".join(out))
+
 def format_clock_ms(ms: int) -> str:
     if ms is None:
         return "--:--"
@@ -52,6 +143,19 @@ def format_clock_ms(ms: int) -> str:
 
 # -------------------- schema helpers --------------------
 
+# WAL lets the server read while we write; the rest keep commits cheap and
+# ride out brief reader locks instead of failing with "database is locked".
+PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA busy_timeout=5000;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-20000;
+PRAGMA wal_autocheckpoint=1000;
+"""
+
+PRAGMA_MMAP = "PRAGMA mmap_size=268435456;\n"   # file-backed DBs only
+
 SCHEMA_RACE = """
 CREATE TABLE IF NOT EXISTS races (
   id              INTEGER PRIMARY KEY,
@@ -124,100 +228,235 @@ CREATE TABLE IF NOT EXISTS race_state (
 );
 """
 
+# -------------------- statements --------------------
+# Kept as module constants so every call hands sqlite3 the same text and
+# hits its prepared-statement cache instead of re-parsing.
+
+_SQL_SELECT_RACE = "SELECT id FROM races WHERE id=?"
+
+_SQL_INSERT_RACE = "INSERT INTO races (id, name, race_type, created_at_utc) VALUES (?, ?, ?, ?)"
+
+_SQL_UPSERT_STATE = """
+INSERT INTO race_state (race_id, started_at_utc, clock_ms, flag, running, race_type, sim, sim_label, source)
+VALUES (?, ?, ?, ?, ?, ?, 1, ?, 'sim')
+ON CONFLICT(race_id) DO UPDATE SET
+  started_at_utc=excluded.started_at_utc, clock_ms=excluded.clock_ms, flag=excluded.flag,
+  running=excluded.running, race_type=excluded.race_type, sim=1, sim_label=excluded.sim_label, source='sim'
+"""
+
+_SQL_INSERT_ENTRANT = "INSERT INTO entrants (name, car_num, org) VALUES (?, ?, ?)"
+
+_SQL_INSERT_RACE_ENTRY = "INSERT OR IGNORE INTO race_entries (race_id, entrant_id, created_at_utc) VALUES (?, ?, ?)"
+
+_SQL_ASSIGN_TAG = """
+INSERT INTO tag_assignments (race_id, entrant_id, tag, effective_from_utc)
+VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_PASS = """
+INSERT INTO passes (race_id, tag, ts_utc, source, meta_json, created_at_utc)
+VALUES (?, ?, ?, 'sim', ?, ?)
+"""
+
+_SQL_DELETE_RACE = (
+    "DELETE FROM passes WHERE race_id=?",
+    "DELETE FROM tag_assignments WHERE race_id=?",
+    "DELETE FROM race_entries WHERE race_id=?",
+    "DELETE FROM race_state WHERE race_id=?",
+    "DELETE FROM races WHERE id=?",
+)
+
 # -------------------- DB layer --------------------
 
 class DB:
     def __init__(self, path: Path):
         self.path = path
-        self.conn = sqlite3.connect(str(path))
+        self.conn = sqlite3.connect(str(path), cached_statements=64)
         self.conn.row_factory = sqlite3.Row
         self.cur = self.conn.cursor()
+        self._pending_passes: List[tuple] = []
+        self._write_q: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_error: Optional[BaseException] = None
+        self._last_state_key: Optional[tuple] = None
         self._init_schema()
 
+    def _pragmas(self) -> str:
+        return PRAGMAS if str(self.path) == ":memory:" else PRAGMAS + PRAGMA_MMAP
+
     def _init_schema(self):
         self.cur.executescript(
+            self._pragmas() +
             SCHEMA_RACE + SCHEMA_ENTRANTS + SCHEMA_RACE_ENTRIES +
             SCHEMA_TAG_ASSIGNMENTS + SCHEMA_PASSES + SCHEMA_STATE
-        )
-        self.conn.commit()
+        )   # executescript commits as it goes
 
     # ----- race lifecycle -----
 
     def ensure_race(self, race_id: int, race_type: str) -> None:
-        self.cur.execute("SELECT id FROM races WHERE id=?", (race_id,))
+        self.cur.execute(_SQL_SELECT_RACE, (race_id,))
         row = self.cur.fetchone()
         if not row:
-            self.cur.execute(
-                "INSERT INTO races (id, name, race_type, created_at_utc) VALUES (?, ?, ?, ?)",
-                (race_id, f"Race {race_id}", race_type, now_ms())
-            )
+            self.cur.execute(_SQL_INSERT_RACE, (race_id, f"Race {race_id}", race_type, now_ms()))
             self.conn.commit()
 
     def upsert_race_state(self, race_id: int, *, started_at: Optional[int], clock_ms: int,
-                          flag: str, running: bool, race_type: str, sim_label: str = "SIM") -> None:
-        self.cur.execute("SELECT race_id FROM race_state WHERE race_id=?", (race_id,))
-        exists = self.cur.fetchone() is not None
-        if exists:
-            self.cur.execute("""
-                UPDATE race_state
-                   SET started_at_utc=?, clock_ms=?, flag=?, running=?, race_type=?, sim=1, sim_label=?, source='sim'
-                 WHERE race_id=?
-            """, (started_at, clock_ms, flag, int(running), race_type, sim_label, race_id))
-        else:
-            self.cur.execute("""
-                INSERT INTO race_state (race_id, started_at_utc, clock_ms, flag, running, race_type, sim, sim_label, source)
-                VALUES (?, ?, ?, ?, ?, ?, 1, ?, 'sim')
-            """, (race_id, started_at, clock_ms, flag, int(running), race_type, sim_label))
-        self.conn.commit()
+                          flag: str, running: bool, race_type: str, sim_label: str = "SIM",
+                          commit: bool = True) -> None:
+        # the UI reads this row at ~1 Hz; a clock that only moved within the same
+        # 100 ms (or a paused race) is not worth an UPSERT
+        key = (race_id, started_at, clock_ms // 100, flag, running, race_type, sim_label)
+        if key == self._last_state_key:
+            return
+        self._last_state_key = key
+        params = (race_id, started_at, clock_ms, flag, int(running), race_type, sim_label)
+        if self._write_q is not None:
+            self._put(("state", params))
+            return
+        self.cur.execute(_SQL_UPSERT_STATE, params)
+        if commit:
+            self.flush()
 
     # ----- participants -----
 
-    def insert_entrant(self, *, name: str, car_num: str, org: str) -> int:
-        self.cur.execute(
-            "INSERT INTO entrants (name, car_num, org) VALUES (?, ?, ?)",
-            (name, car_num, org)
-        )
-        self.conn.commit()
+    # Pass commit=False to fold several calls into the caller's transaction.
+
+    def insert_entrant(self, *, name: str, car_num: str, org: str, commit: bool = True) -> int:
+        self.cur.execute(_SQL_INSERT_ENTRANT, (name, car_num, org))
+        if commit:
+            self.conn.commit()
         return int(self.cur.lastrowid)
 
-    def ensure_race_entry(self, race_id: int, entrant_id: int) -> None:
-        self.cur.execute(
-            "INSERT OR IGNORE INTO race_entries (race_id, entrant_id, created_at_utc) VALUES (?, ?, ?)",
-            (race_id, entrant_id, now_ms())
-        )
-        self.conn.commit()
+    def ensure_race_entry(self, race_id: int, entrant_id: int, *, commit: bool = True) -> None:
+        self.cur.execute(_SQL_INSERT_RACE_ENTRY, (race_id, entrant_id, now_ms()))
+        if commit:
+            self.conn.commit()
 
-    def assign_tag(self, race_id: int, entrant_id: int, tag: str, *, start_ms: int) -> None:
-        self.cur.execute("""
-            INSERT INTO tag_assignments (race_id, entrant_id, tag, effective_from_utc)
-            VALUES (?, ?, ?, ?)
-        """, (race_id, entrant_id, tag, start_ms))
-        self.conn.commit()
+    def assign_tag(self, race_id: int, entrant_id: int, tag: str, *, start_ms: int, commit: bool = True) -> None:
+        self.cur.execute(_SQL_ASSIGN_TAG, (race_id, entrant_id, tag, start_ms))
+        if commit:
+            self.conn.commit()
 
     # ----- timing -----
 
     def insert_pass(self, race_id: int, tag: str, ts_ms: Optional[int] = None, **meta) -> None:
-        ts_ms = ts_ms if ts_ms is not None else now_ms()
-        self.cur.execute("""
-            INSERT INTO passes (race_id, tag, ts_utc, source, meta_json, created_at_utc)
-            VALUES (?, ?, ?, 'sim', ?, ?)
-        """, (race_id, tag, ts_ms, json.dumps(meta) if meta else None, now_ms()))
+        """Queue a pass; it is written on the next flush() (or by the writer thread)."""
+        created = now_ms()
+        row = (race_id, tag, created if ts_ms is None else ts_ms, json.dumps(meta) if meta else None, created)
+        if self._write_q is not None:
+            self._put(("pass", row))
+        else:
+            self._pending_passes.append(row)
+
+    def insert_passes_bulk(self, rows: List[Tuple[int, str, int]]) -> None:
+        """Write (race_id, tag, ts_ms) rows, plus anything already queued, in one transaction."""
+        created = now_ms()
+        batch = [(race_id, tag, ts_ms, None, created) for race_id, tag, ts_ms in rows]
+        if self._write_q is not None:
+            self._put(("passes", batch))
+            return
+        self._pending_passes.extend(batch)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write queued passes and commit everything pending as one transaction.
+
+        With the writer thread running this is a no-op; it commits as it drains.
+        """
+        if self._write_q is not None:
+            return
+        if self._pending_passes:
+            self.cur.executemany(_SQL_INSERT_PASS, self._pending_passes)
+            self._pending_passes.clear()
         self.conn.commit()
 
+    # ----- background writer -----
+
+    def start_writer(self) -> None:
+        """Hand pass/state writes to a thread with its own connection (file-backed DBs only)."""
+        if self._writer is not None or str(self.path) == ":memory:":
+            return
+        self.flush()
+        self._write_q = queue.Queue(maxsize=WRITER_QUEUE_MAX)
+        self._writer = threading.Thread(target=self._writer_loop, name="sim-db-writer", daemon=True)
+        self._writer.start()
+
+    def stop_writer(self) -> None:
+        """Drain and stop the writer; later writes go through this connection again."""
+        if self._writer is None:
+            return
+        try:
+            self._put(None)
+        finally:
+            self._writer.join()
+            self._writer = None
+            self._write_q = None
+
+    def _put(self, item: Optional[tuple]) -> None:
+        # blocks only when the writer is WRITER_QUEUE_MAX items behind; waits in
+        # slices so a writer that died meanwhile raises here instead of hanging
+        while True:
+            if self._writer_error is not None:
+                raise self._writer_error
+            if not self._writer.is_alive():
+                raise RuntimeError("sim-db-writer exited")
+            try:
+                self._write_q.put(item, timeout=WRITER_PUT_WAIT_S)
+                return
+            except queue.Full:
+                pass
+
+    def _writer_loop(self) -> None:
+        q = self._write_q
+        conn = sqlite3.connect(str(self.path), cached_statements=64)
+        try:
+            conn.executescript(self._pragmas())
+            item = q.get()
+            while item is not None:
+                passes: List[tuple] = []
+                states = {}     # race_id -> latest state row; older ones are superseded
+                idle = False
+                for _ in range(WRITER_BATCH):
+                    kind, payload = item
+                    if kind == "pass":
+                        passes.append(payload)
+                    elif kind == "passes":
+                        passes.extend(payload)
+                    else:
+                        states[payload[0]] = payload
+                    try:
+                        item = q.get(timeout=WRITER_LINGER_S)
+                    except queue.Empty:
+                        idle = True
+                        break
+                    if item is None:
+                        break
+                # a full batch carries `item` over to the next transaction
+                with conn:
+                    if passes:
+                        conn.executemany(_SQL_INSERT_PASS, passes)
+                    if states:
+                        conn.executemany(_SQL_UPSERT_STATE, states.values())
+                if idle:
+                    item = q.get()
+        except BaseException as exc:
+            self._writer_error = exc
+        finally:
+            conn.close()
+
     # ----- cleanup -----
 
     def delete_race(self, race_id: int) -> None:
-        self.cur.execute("DELETE FROM passes WHERE race_id=?", (race_id,))
-        self.cur.execute("DELETE FROM tag_assignments WHERE race_id=?", (race_id,))
-        self.cur.execute("DELETE FROM race_entries WHERE race_id=?", (race_id,))
-        self.cur.execute("DELETE FROM race_state WHERE race_id=?", (race_id,))
-        self.cur.execute("DELETE FROM races WHERE id=?", (race_id,))
+        for sql in _SQL_DELETE_RACE:
+            self.cur.execute(sql, (race_id,))
         self.conn.commit()
 
 # -------------------- model --------------------
 
-@dataclass
+@dataclass(slots=True)
 class EntrantSim:
+    # identity + console stats only; the per-crossing fields (next pass, last
+    # crossing, lap count) live in index-aligned lists on Simulator
     entrant_id: int
     tag: str
     name: str
@@ -225,11 +464,8 @@ class EntrantSim:
     org: str
     mean_lap: float
     stddev: float = 1.8
-    next_pass_t: float = 0.0
     last_lap_s: Optional[float] = None      # duration of most recent completed lap
-    last_cross_s: Optional[float] = None    # sim clock time of last line crossing
     best_lap_s: Optional[float] = None
-    laps: int = 0
 
 @dataclass
 class SimState:
@@ -238,11 +474,11 @@ class SimState:
     running: bool = False
     flag: str = "pre"
     speed: float = 1.0
-    sim_clock_s: float = 0.0
+    sim_clock_ms: int = 0
     started: bool = False
     quit: bool = False
-    blue_until_s: float = 0.0
-    blue_schedule_s: List[Tuple[float, float]] = field(default_factory=list)
+    blue_until_ms: int = 0
+    blue_schedule_ms: List[Tuple[int, int]] = field(default_factory=list)
 
 # -------------------- input prompt --------------------
 
@@ -255,36 +491,91 @@ class CommandInput:
     def __init__(self):
         self.buffer = ""
         self._last_drawn = ""
+        self._eof = False
+        self._saved_tty = None
+        if os.name != "nt" and sys.stdin.isatty():
+            # cbreak: keys arrive one at a time without waiting for Enter (we echo ourselves)
+            fd = sys.stdin.fileno()
+            self._saved_tty = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+            atexit.register(self.restore)
+
+    def restore(self):
+        if self._saved_tty is not None:
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self._saved_tty)
+            self._saved_tty = None
+
+    def poll(self, timeout: float = 0.0) -> List[str]:
+        """
+        Feed any pending keystrokes through handle_key and return completed commands.
+        Waits at most `timeout` seconds for input, so it doubles as the loop's tick sleep.
+        """
+        if os.name == "nt":
+            if not msvcrt.kbhit():
+                time.sleep(timeout)
+            chars = []
+            while msvcrt.kbhit():
+                ch = msvcrt.getwch()
+                if ch in ("\x00", "\xe0"):
+                    # arrow/function key: a prefix plus a scan code, neither is text
+                    msvcrt.getwch()
+                    continue
+                chars.append(ch)
+            data = "".join(chars)
+        else:
+            if self._eof or not select.select([sys.stdin], [], [], timeout)[0]:
+                if self._eof:
+                    time.sleep(timeout)
+                return []
+            # read the raw fd: sys.stdin's own buffer would hide bytes from select()
+            raw = os.read(sys.stdin.fileno(), 1024)
+            if not raw:
+                self._eof = True
+                return []
+            data = raw.decode(errors="ignore")
+
+        cmds = []
+        for ch in data:
+            cmd = self.handle_key(ch)
+            if cmd is not None:
+                cmds.append(cmd)
+        # echo the whole burst (a paste, a fast typist) with one redraw
+        self.draw_prompt(reset=False)
+        return cmds
 
     def draw_prompt(self, reset=False):
-        # erase the previous prompt line and redraw
-        # (works well after a full-screen render or when resetting)
-        sys.stdout.write("\r")
+        # erase the previous prompt line and redraw; built as one string and
+        # handed to the OS in a single write
+        line = "Enter command > " + self.buffer
         if reset:
-            # write a fresh line at the bottom
-            sys.stdout.write("Enter command > ")
-            sys.stdout.write(self.buffer)
+            # fresh line at the bottom, right after a full-screen render
+            out = "\r" + line
+        elif line != self._last_drawn:
+            if vt_enabled():
+                out = "\r\033[2K" + line
+            else:
+                # no erase-line escape: blank out what a longer previous prompt left behind
+                pad = max(0, len(self._last_drawn) - len(line))
+                out = "\r" + line + " " * pad + "\b" * pad
         else:
-            # re-draw only if changed
-            line = "Enter command > " + self.buffer
-            if line != self._last_drawn:
-                # clear current line then redraw
-                sys.stdout.write("\033[2K")
-                sys.stdout.write(line)
-                self._last_drawn = line
-        sys.stdout.flush()
+            return
+        self._last_drawn = line
+        sys.stdout.flush()  # whatever render() queued must land before the prompt
+        os.write(sys.stdout.fileno(), out.encode(sys.stdout.encoding or "utf-8", "replace"))
 
     def handle_key(self, ch: str) -> Optional[str]:
-        if ch == "\n":
+        """Apply one keystroke to the buffer; the caller redraws the prompt."""
+        if ch in ("\n", "\r"):
             cmd = self.buffer.strip()
             self.buffer = ""
-            self._last_drawn = ""
             return cmd
-        elif ch == "\x7f":  # backspace
+        if ch in ("\x7f", "\b"):  # backspace
             self.buffer = self.buffer[:-1]
         else:
-            self.buffer += ch
-        self.draw_prompt(reset=False)
+            o = ord(ch)
+            # printable ASCII or Latin-1 and up; skips control chars and escape bytes
+            if 0x20 <= o < 0x7f or o > 0xa0:
+                self.buffer += ch
         return None
 
 # -------------------- simulator --------------------
@@ -309,6 +600,7 @@ class Simulator:
     def __init__(self, args: Args):
         self.args = args
         random.seed(args.seed)
+        self._rng = np.random.default_rng(args.seed) if np is not None else None
         self.db = DB(args.db)
         self.state = SimState(race_id=args.race_id, race_type=args.race_type)
         self.epoch_ms = now_ms()
@@ -326,36 +618,60 @@ class Simulator:
             sim_label="SIM"
         )
 
-        # Seed entrants
+        # Seed entrants (one transaction for the whole field)
         base_tag = 100000
-        for i in range(max(3, min(24, args.entrants))):
-            name = f"Racer {i+1}"
-            car  = f"{(i % 89) + 11:02d}"
-            org  = f"Team {i+1}"
-            tag  = str(base_tag + i + 1)
-            mean = max(6.0, random.uniform(args.lap_min, args.lap_max))
-
-            eid = self.db.insert_entrant(name=name, car_num=car, org=org)
-            self.db.ensure_race_entry(self.state.race_id, eid)
-            self.db.assign_tag(self.state.race_id, eid, tag, start_ms=self.epoch_ms)
-
-            self.entrants.append(EntrantSim(
-                entrant_id=eid, tag=tag, name=name, car=car, org=org, mean_lap=mean, stddev=args.lap_jitter
-            ))
+        with self.db.conn:
+            for i in range(max(3, min(24, args.entrants))):
+                name = f"Racer {i+1}"
+                car  = f"{(i % 89) + 11:02d}"
+                org  = f"Team {i+1}"
+                tag  = str(base_tag + i + 1)
+                mean = max(6.0, random.uniform(args.lap_min, args.lap_max))
+
+                eid = self.db.insert_entrant(name=name, car_num=car, org=org, commit=False)
+                self.db.ensure_race_entry(self.state.race_id, eid, commit=False)
+                self.db.assign_tag(self.state.race_id, eid, tag, start_ms=self.epoch_ms, commit=False)
+
+                self.entrants.append(EntrantSim(
+                    entrant_id=eid, tag=tag, name=name, car=car, org=org, mean_lap=mean, stddev=args.lap_jitter
+                ))
+        # setup needed lastrowid round-trips; from here on writes go to the writer thread
+        self.db.start_writer()
+
+        n = len(self.entrants)
+        self.next_ms: List[int] = [UNSCHEDULED] * n   # sim ms of each entrant's next crossing
+        self.laps: List[int] = [0] * n
+        self.last_cross_ms: List[Optional[int]] = [None] * n   # sim ms of last line crossing
+        # pre-drawn lap times (ms), one column per entrant, drawn in one NumPy call
+        self._lap_pool: List[List[int]] = [[] for _ in range(n)]
+        self._pool_idx: List[int] = [0] * n
+        if self._rng is not None:
+            self._fill_pool(range(n))
+        # (next_ms, idx) min-heap; entries whose time no longer matches next_ms[idx] are stale
+        self._pass_heap: List[Tuple[int, int]] = []
 
         # Auto-blue schedule (optional)
+        self._blue_ms = int(args.blue_duration_sec * 1000)
         if args.blue_every_mins > 0:
-            step = args.blue_every_mins * 60.0
+            step = int(args.blue_every_mins * 60_000)
             for k in range(1, 1000):
                 s = step * k
-                self.state.blue_schedule_s.append((s, s + args.blue_duration_sec))
+                self.state.blue_schedule_ms.append((s, s + self._blue_ms))
         if args.blue_at:
             for m in args.blue_at:
-                s = float(m) * 60.0
-                self.state.blue_schedule_s.append((s, s + args.blue_duration_sec))
+                s = int(float(m) * 60_000)
+                self.state.blue_schedule_ms.append((s, s + self._blue_ms))
+        self.state.blue_schedule_ms.sort()
+        self._blue_idx = 0       # first window that hasn't ended yet
+        self._clock_rem = 0.0    # sub-millisecond carry so integer ticks don't drift
 
         self.cmd = CommandInput()
-        self._last_hash = ""
+        self._view_buf = io.StringIO()
+        self._prev_lines: List[str] = []   # rows of the frame currently on screen
+        self._term_size = None   # terminal size that frame was drawn for
+        self._last_view_key = None
+        self._dirty = 0          # bumped whenever standings or flag change
+        self._table_cache = ("", -1)  # (standings text, _dirty it was built at)
 
     # --- flow control ---
 
@@ -364,60 +680,150 @@ class Simulator:
         self.db.upsert_race_state(
             self.state.race_id,
             started_at=self.epoch_ms if self.state.started else None,
-            clock_ms=int(self.state.sim_clock_s * 1000),
+            clock_ms=self.state.sim_clock_ms,
             flag=f,
             running=self.state.running,
             race_type=self.state.race_type
         )
         self.render(force=True)
 
+    def emit_pass(self, tag: str, clock_ms: int) -> None:
+        """Queue the pass for one scheduled crossing (sim clock ms); called from cross().
+
+        The grid release in on_first_green() bypasses this and writes its burst
+        through DB.insert_passes_bulk.
+        """
+        self.db.insert_pass(self.state.race_id, tag, self.epoch_ms + clock_ms)
+
+    def cross(self, i: int, at_ms: int) -> None:
+        """Record a scheduled crossing: write the pass, update console stats, schedule the next."""
+        ent = self.entrants[i]
+        self.emit_pass(ent.tag, at_ms)
+        # console stats only; lap time is measured from the previous crossing
+        prev = self.last_cross_ms[i]
+        if prev is not None:
+            lap_s = (at_ms - prev) / 1000.0
+            ent.last_lap_s = lap_s
+            ent.best_lap_s = lap_s if ent.best_lap_s is None else min(ent.best_lap_s, lap_s)
+        self.last_cross_ms[i] = at_ms
+        self.laps[i] += 1
+        self._schedule(i, self.sample_lap(i, at_ms))
+        self._dirty += 1
+
+    def _schedule(self, i: int, at_ms: int) -> None:
+        self.next_ms[i] = at_ms
+        heapq.heappush(self._pass_heap, (at_ms, i))
+
+    def _pop_due(self, until_ms: int) -> Optional[Tuple[int, int]]:
+        """Pop the earliest live (next_ms, idx) at or before until_ms, dropping stale entries."""
+        heap, nxt = self._pass_heap, self.next_ms
+        while heap and heap[0][0] <= until_ms:
+            t, i = heapq.heappop(heap)
+            if t == nxt[i]:
+                return t, i
+        return None
+
     def on_first_green(self):
         # one crossing per entrant to clear the grid (sprint only)
-        for e in self.entrants:
-            # use current sim time as the pass
-            self.db.insert_pass(self.state.race_id, e.tag, self.epoch_ms + int(self.state.sim_clock_s * 1000))
-            e.last_cross_s = self.state.sim_clock_s
-            e.next_pass_t = self.sample_lap(e)
-
-    def sample_lap(self, e: EntrantSim) -> float:
+        now = self.state.sim_clock_ms
+        n = len(self.entrants)
+        # the whole grid crosses at the current sim time; commit it at once so the
+        # start shows up immediately rather than on the next flush
+        ts = self.epoch_ms + now
+        self.db.insert_passes_bulk([(self.state.race_id, e.tag, ts) for e in self.entrants])
+        self.last_cross_ms = [now] * n
+        self.next_ms = [self.sample_lap(i, now) for i in range(n)]
+        self._pass_heap = [(t, i) for i, t in enumerate(self.next_ms)]
+        heapq.heapify(self._pass_heap)
+        self._dirty += 1
+
+    def _fill_pool(self, idxs) -> None:
+        """Redraw the lap-time pool for the given entrants with a single (rows, len(idxs)) draw."""
+        idxs = list(idxs)
+        mean = np.array([self.entrants[i].mean_lap for i in idxs])
+        std = np.array([self.entrants[i].stddev for i in idxs])
+        draws = self._rng.normal(mean, std, size=(SAMPLE_POOL_SIZE, len(idxs)))
+        cols = (np.maximum(draws, MIN_LAP_S) * 1000).astype(np.int64).T.tolist()
+        for i, col in zip(idxs, cols):
+            self._lap_pool[i] = col
+            self._pool_idx[i] = 0
+
+    def sample_lap(self, i: int, from_ms: int) -> int:
         # gaussian lap time around mean, clamp to sensible min
-        base = random.gauss(e.mean_lap, e.stddev)
-        base = max(3.0, base)
-        return self.state.sim_clock_s + base
+        if self._rng is None:
+            e = self.entrants[i]
+            base = max(MIN_LAP_S, random.gauss(e.mean_lap, e.stddev))
+            return from_ms + int(base * 1000)
+        k = self._pool_idx[i]
+        if k >= SAMPLE_POOL_SIZE:
+            self._fill_pool((i,))
+            k = 0
+        self._pool_idx[i] = k + 1
+        return from_ms + self._lap_pool[i][k]
 
     # --- view / console ---
 
-    def _rows(self):
-        rows = []
-        for e in self.entrants:
-            rows.append((e.name, e.car, e.laps, e.last_lap_s, e.best_lap_s, e.next_pass_t))
-        rows.sort(key=lambda r: (-r[2], r[5]))
-        return rows
-
-    def _view(self) -> str:
-        lines = []
-        lines.append(f"PRS Simulator Feed - Race {self.state.race_id}")
-        lines.append(f"Race Type: {self.state.race_type}   Speed: {self.state.speed:.2f}x   Flag: {self.state.flag}   Running: {self.state.running}")
-        lines.append(f"Clock: {format_clock_ms(int(self.state.sim_clock_s*1000))}   Entrants: {len(self.entrants)}   DB: {self.db.path}")
-        lines.append("")
-        lines.append("Pos | Car | Racer Name                 | Laps | Last(s) | Best(s)")
-        lines.append("----+-----+----------------------------+------+---------+--------")
-        for i, (name, car, laps, last, best, _) in enumerate(self._rows(), start=1):
+    def _table(self) -> str:
+        """Standings body, formatted once per lap change rather than once per frame."""
+        text, ver = self._table_cache
+        if ver == self._dirty:
+            return text
+        # most laps first, then earliest next crossing, packed into one int per car
+        # (next_ms < 2**63) so the sort compares ints instead of tuples; the sort
+        # is stable, so ties keep grid order
+        laps, ents = self.laps, self.entrants
+        keys = [(-n << 63) + t for n, t in zip(laps, self.next_ms)]
+        order = sorted(range(len(ents)), key=keys.__getitem__)
+        buf = io.StringIO()
+        w = buf.write
+        for pos, i in enumerate(order, start=1):
+            e = ents[i]
+            last, best = e.last_lap_s, e.best_lap_s
             last_s = f"{last:5.2f}" if last is not None else "  -  "
             best_s = f"{best:5.2f}" if best is not None else "  -  "
-            lines.append(f"{i:3d} | {car:>3s} | {name:<26} | {laps:4d} | {last_s:>7} | {best_s:>6}")
-        lines.append("")
-        lines.append("Commands: s=start  p=pause  t=toggle  g=green  y=yellow  r=red  w=white  b=blue  c=checkered  n=next  +=faster  -=slower  x=pre  q=quit")
-        lines.append("")
-        return "\n".join(lines)
+            w(_ROW_FMT(pos, e.car, e.name, laps[i], last_s, best_s))
+        text = buf.getvalue()
+        self._table_cache = (text, self._dirty)
+        return text
+
+    def _view(self) -> str:
+        st = self.state
+        buf = self._view_buf
+        buf.seek(0)
+        buf.truncate()
+        w = buf.write
+        w(f"PRS Simulator Feed - Race {st.race_id}\n")
+        w(f"Race Type: {st.race_type}   Speed: {st.speed:.2f}x   Flag: {st.flag}   Running: {st.running}\n")
+        w(f"Clock: {format_clock_ms(st.sim_clock_ms)}   Entrants: {len(self.entrants)}   DB: {self.db.path}\n")
+        w(_VIEW_HEADER)
+        w(self._table())
+        w(_VIEW_FOOTER)
+        return buf.getvalue()
 
     def render(self, force=False):
-        view = self._view()
-        h = hashlib.md5(view.encode()).hexdigest()
-        if force or h != self._last_hash:
-            clear_screen()
-            print(view)
-            self._last_hash = h
+        # everything the view depends on; the clock only shows whole seconds
+        size = shutil.get_terminal_size()
+        key = (self._dirty, self.state.sim_clock_ms // 1000, self.state.flag,
+               self.state.running, self.state.speed, size)
+        if not force and key == self._last_view_key:
+            return
+        self._last_view_key = key
+        # clipped one short of the width so no line wraps (or parks the cursor in
+        # the last column) and screen rows stay one-to-one with view lines
+        width = size.columns - 1
+        lines = [line[:width] for line in self._view().split("\n")]
+        if force or lines != self._prev_lines or size != self._term_size:
+            if not self._prev_lines or size != self._term_size or not fits_screen(lines):
+                # first frame, a resized window, or a view too tall to address by row
+                clear_screen()
+                print("\n".join(lines))
+            elif force:
+                # full repaint: also covers anything else that wrote to the terminal
+                repaint_in_place("\n".join(lines) + "\n")
+            else:
+                repaint_changed(self._prev_lines, lines)
+            self._prev_lines = lines
+            self._term_size = size
             # draw the prompt exactly once per full render
             self.cmd.draw_prompt(reset=True)
 
@@ -427,53 +833,43 @@ class Simulator:
         self.db.upsert_race_state(
             self.state.race_id,
             started_at=self.epoch_ms if self.state.started else None,
-            clock_ms=int(self.state.sim_clock_s * 1000),
+            clock_ms=self.state.sim_clock_ms,
             flag=self.state.flag,
             running=self.state.running,
-            race_type=self.state.race_type
+            race_type=self.state.race_type,
+            commit=False,   # run() flushes on FLUSH_INTERVAL_S
         )
 
     def tick(self, dt_real: float):
         # update simulated race clock
         if self.state.running:
-            self.state.sim_clock_s += dt_real * self.state.speed
-
-        # scheduled passes
-        nxt_idx = None
-        nxt_t = 1e12
-        for idx, e in enumerate(self.entrants):
-            if e.next_pass_t and e.next_pass_t < nxt_t:
-                nxt_t = e.next_pass_t
-                nxt_idx = idx
-
-        if nxt_idx is not None and nxt_t <= self.state.sim_clock_s:
-            ent = self.entrants[nxt_idx]
-            ts = self.epoch_ms + int(ent.next_pass_t*1000)
-            self.db.insert_pass(self.state.race_id, ent.tag, ts)
-            # console stats only
-            if ent.last_cross_s is None:
-                # first crossing since green (after grid release): no prior lap to time
-                ent.last_cross_s = nxt_t
-            else:
-                lap_s = nxt_t - ent.last_cross_s
-                ent.last_lap_s = lap_s
-                ent.best_lap_s = lap_s if ent.best_lap_s is None else min(ent.best_lap_s, lap_s)
-                ent.last_cross_s = nxt_t
-            ent.laps += 1
-            ent.next_pass_t = self.sample_lap(ent)
+            adv = dt_real * 1000.0 * self.state.speed + self._clock_rem
+            step = int(adv)
+            self._clock_rem = adv - step
+            self.state.sim_clock_ms += step
+        clock_ms = self.state.sim_clock_ms
+
+        # scheduled passes: every crossing that came due during this tick
+        while (due := self._pop_due(clock_ms)) is not None:
+            self.cross(due[1], due[0])
 
         # transient blue
-        if self.state.flag == "blue" and self.state.sim_clock_s >= self.state.blue_until_s:
+        if self.state.flag == "blue" and clock_ms >= self.state.blue_until_ms:
             self.state.flag = "green"
-
-        # scheduled blues
-        for start_s, end_s in list(self.state.blue_schedule_s):
-            if start_s <= self.state.sim_clock_s <= end_s:
+            self._dirty += 1
+
+        # scheduled blues (sorted, half-open [start, end) like blue_until_ms;
+        # windows behind the pointer have already ended)
+        sched = self.state.blue_schedule_ms
+        while self._blue_idx < len(sched) and sched[self._blue_idx][1] <= clock_ms:
+            self._blue_idx += 1
+        if self._blue_idx < len(sched):
+            start_ms, end_ms = sched[self._blue_idx]
+            if start_ms <= clock_ms:
+                if self.state.flag != "blue":
+                    self._dirty += 1
                 self.state.flag = "blue"
-                self.state.blue_until_s = end_s
-
-        # write state row
-        self.write_state()
+                self.state.blue_until_ms = end_ms
 
     # --- command processing ---
 
@@ -514,7 +910,7 @@ class Simulator:
         if c in ("w","white"):   self.set_flag("white");   return
         if c in ("b","blue"):
             self.state.flag = "blue"
-            self.state.blue_until_s = self.state.sim_clock_s + self.args.blue_duration_sec
+            self.state.blue_until_ms = self.state.sim_clock_ms + self._blue_ms
             self.render(force=True)
             return
         if c in ("c","checkered","chk"):
@@ -530,12 +926,10 @@ class Simulator:
         if c in ("n","next"):
             if not self.state.running:
                 # fire one pass for the earliest scheduled entrant
-                ent = min(self.entrants, key=lambda x: x.next_pass_t if x.next_pass_t>0 else 9e9)
-                if ent and ent.next_pass_t>0:
-                    ts = self.epoch_ms + int(max(ent.next_pass_t, self.state.sim_clock_s)*1000)
-                    self.db.insert_pass(self.state.race_id, ent.tag, ts)
-                    ent.laps += 1
-                    ent.next_pass_t = self.sample_lap(ent)
+                due = self._pop_due(UNSCHEDULED - 1)
+                if due is not None:
+                    t, i = due
+                    self.cross(i, max(t, self.state.sim_clock_ms))
                     self.render(force=True)
             return
 
@@ -544,8 +938,10 @@ class Simulator:
             self.state.running = False
             self.state.flag = "pre"
             self.state.started = False
-            self.state.sim_clock_s = 0.0
-            self.state.blue_until_s = 0.0
+            self.state.sim_clock_ms = 0
+            self._clock_rem = 0.0
+            self._blue_idx = 0
+            self.state.blue_until_ms = 0
             self.db.upsert_race_state(
                 self.state.race_id,
                 started_at=None,
@@ -562,23 +958,35 @@ class Simulator:
     def run(self):
         self.render(force=True)
         last = time.perf_counter()
+        last_render = last_flush = last_state = last
         while not self.state.quit:
             now = time.perf_counter()
             dt = now - last
             last = now
 
-            # non-blocking read from stdin (very simple)
-            import select
-            if select.select([sys.stdin], [], [], 0)[0]:
-                ch = sys.stdin.read(1)
-                cmd = self.cmd.handle_key(ch)
-                if cmd is not None:
-                    self.process_cmd(cmd)
-
             self.tick(dt)
-            time.sleep(0.05)  # ~20 Hz sim tick
+
+            # I/O runs on its own cadences, not every tick
+            if now - last_state >= STATE_INTERVAL_S:
+                self.write_state()
+                last_state = now
+            if now - last_flush >= FLUSH_INTERVAL_S:
+                self.db.flush()
+                last_flush = now
+            if now - last_render >= RENDER_INTERVAL_S:
+                self.render()
+                last_render = now
+
+            # wait for input up to one tick (~20 Hz); keystrokes wake us immediately
+            for cmd in self.cmd.poll(TICK_S):
+                self.process_cmd(cmd)
+
+        self.cmd.restore()
 
         # on quit
+        self.write_state()
+        self.db.stop_writer()
+        self.db.flush()
         if not self.args.keep:
             self.db.delete_race(self.state.race_id)
 
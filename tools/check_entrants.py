@@ -1,6 +1,7 @@
 import sqlite3
 
-con = sqlite3.connect('backend/db/laps.sqlite')
+con = sqlite3.connect('file:backend/db/laps.sqlite?mode=ro', uri=True)
+con.execute("PRAGMA query_only=1")
 
 rows = con.execute("""
     SELECT entrant_id, name, number, tag, enabled 
@@ -1,60 +1,78 @@
+import io
 import sqlite3
+import sys
+from operator import itemgetter
 from pathlib import Path
 
+# Row layouts, bound once so the per-row work is a single format call
+_RULE = "=" * 100 + "\n"
+_DASH = "-" * 100 + "\n"
+_LAP_HDR = f"{'Entrant':<10} {'Lap#':<6} {'Lap_ms':<10} {'Lap_s':<10} {'Valid':<6} {'Created_at'}\n"
+_LAP_FMT = "{:<10} {:<6} {:<10} {:<10.3f} {:<6} {}\n".format
+_BEST_HDR = f"{'Entrant':<10} {'Best_ms':<10} {'Best_s':<10} {'Total Laps'}\n"
+_BEST_FMT = "{:<10} {:<10} {:<10.3f} {}\n".format
+_BATCH = 1000
+
 db_path = Path("backend/db/laps.sqlite")
-con = sqlite3.connect(db_path)
-con.row_factory = sqlite3.Row
+con = sqlite3.connect(f"file:{db_path.as_posix()}?mode=ro", uri=True)
+con.execute("PRAGMA query_only=1")
+
+# the whole report is built here and written once at the end
+out = io.StringIO()
+write = out.write
 
-print("=" * 100)
-print("PASSES TABLE - First 50 laps")
-print("=" * 100)
+write(_RULE + "PASSES TABLE - First 50 laps\n" + _RULE)
 rows = con.execute("""
-    SELECT entrant_id, lap_num, lap_ms, is_valid, created_at 
-    FROM passes 
-    ORDER BY created_at 
+    SELECT entrant_id, lap_num, lap_ms, is_valid, created_at
+    FROM passes
+    ORDER BY created_at
     LIMIT 50
-""").fetchall()
-
-print(f"{'Entrant':<10} {'Lap#':<6} {'Lap_ms':<10} {'Lap_s':<10} {'Valid':<6} {'Created_at'}")
-print("-" * 100)
-for r in rows:
-    lap_s = round(r['lap_ms'] / 1000.0, 3) if r['lap_ms'] else 0
-    print(f"{r['entrant_id']:<10} {r['lap_num']:<6} {r['lap_ms']:<10} {lap_s:<10.3f} {r['is_valid']:<6} {r['created_at']}")
-
-print("\n" + "=" * 100)
-print("BEST LAPS BY ENTRANT")
-print("=" * 100)
-best = con.execute("""
-    SELECT entrant_id, MIN(lap_ms) as best_ms, COUNT(*) as total_laps
-    FROM passes 
+""")
+
+write(_LAP_HDR + _DASH)
+for entrant_id, lap_num, lap_ms, is_valid, created_at in rows:
+    lap_s = round(lap_ms / 1000.0, 3) if lap_ms else 0
+    write(_LAP_FMT(entrant_id, lap_num, lap_ms, lap_s, is_valid, created_at))
+
+# One pass over the valid laps feeds both sections below: the window columns
+# carry each entrant's best and count on every row, and the short laps are
+# picked out of the same rows instead of re-scanning the table.
+valid = con.execute("""
+    SELECT entrant_id, lap_num, lap_ms, is_valid, created_at,
+           MIN(lap_ms) OVER w AS best_ms,
+           COUNT(*)    OVER w AS total_laps,
+           rowid
+    FROM passes
     WHERE is_valid = 1
-    GROUP BY entrant_id
+    WINDOW w AS (PARTITION BY entrant_id)
     ORDER BY entrant_id
-""").fetchall()
-
-print(f"{'Entrant':<10} {'Best_ms':<10} {'Best_s':<10} {'Total Laps'}")
-print("-" * 100)
-for r in best:
-    best_s = round(r['best_ms'] / 1000.0, 3) if r['best_ms'] else 0
-    print(f"{r['entrant_id']:<10} {r['best_ms']:<10} {best_s:<10.3f} {r['total_laps']}")
-
-print("\n" + "=" * 100)
-print("SUSPICIOUSLY SHORT LAPS (< 15s)")
-print("=" * 100)
-short = con.execute("""
-    SELECT entrant_id, lap_num, lap_ms, is_valid, created_at
-    FROM passes 
-    WHERE lap_ms < 15000 AND is_valid = 1
-    ORDER BY lap_ms
-""").fetchall()
+""")
+
+write("\n" + _RULE + "BEST LAPS BY ENTRANT\n" + _RULE)
+write(_BEST_HDR + _DASH)
+short = []
+prev = None
+while batch := valid.fetchmany(_BATCH):
+    for r in batch:
+        entrant_id, lap_num, lap_ms, is_valid, created_at, best_ms, total_laps, _ = r
+        if lap_ms is not None and lap_ms < 15000:
+            short.append(r)
+        if entrant_id == prev:
+            continue
+        prev = entrant_id
+        best_s = round(best_ms / 1000.0, 3) if best_ms else 0
+        write(_BEST_FMT(entrant_id, best_ms, best_s, total_laps))
+
+write("\n" + _RULE + "SUSPICIOUSLY SHORT LAPS (< 15s)\n" + _RULE)
+# ties keep table order, as the old ORDER BY lap_ms scan did
+short.sort(key=itemgetter(2, 7))
 
 if short:
-    print(f"{'Entrant':<10} {'Lap#':<6} {'Lap_ms':<10} {'Lap_s':<10} {'Valid':<6} {'Created_at'}")
-    print("-" * 100)
-    for r in short:
-        lap_s = round(r['lap_ms'] / 1000.0, 3)
-        print(f"{r['entrant_id']:<10} {r['lap_num']:<6} {r['lap_ms']:<10} {lap_s:<10.3f} {r['is_valid']:<6} {r['created_at']}")
+    write(_LAP_HDR + _DASH)
+    for entrant_id, lap_num, lap_ms, is_valid, created_at, *_ in short:
+        write(_LAP_FMT(entrant_id, lap_num, lap_ms, round(lap_ms / 1000.0, 3), is_valid, created_at))
 else:
-    print("No short laps found (all laps >= 15s)")
+    write("No short laps found (all laps >= 15s)\n")
 
+sys.stdout.write(out.getvalue())
 con.close()
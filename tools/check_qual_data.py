@@ -1,7 +1,30 @@
 import sqlite3
+from itertools import groupby
+from operator import itemgetter
 
-con = sqlite3.connect('backend/db/laps.sqlite')
+# Grid as recorded in the events config: (order, entrant, best_ms, best_s, note)
+_ACTUAL_GRID = (
+    (1, 4, 20610, 20.61, ""),
+    (2, 3, 20619, 20.619, ""),
+    (3, 15, 20901, 20.901, ""),
+    (4, 5, 21345, 21.345, ""),
+    (5, 6, 21362, 21.362, ""),
+    (6, 14, 22070, 22.07, ""),
+    (7, 7, 22644, 22.644, ""),
+    (8, 12, 23168, 23.168, ""),
+    (9, 9, 23445, 23.445, ""),
+    (10, 10, 26223, 26.223, ""),
+    (11, 8, 27760, 27.76, ""),
+    (12, 2, 29063, 29.063, ""),
+    (13, 11, 22744, 22.744, "(brake fail - demoted)"),
+)
+
+con = sqlite3.connect('file:backend/db/laps.sqlite?mode=ro', uri=True)
+con.execute("PRAGMA query_only=1")
 con.row_factory = sqlite3.Row
+# Reads only. The query below is served in order by result_laps' primary key
+# (race_id, entrant_id, lap_no), so it needs no extra index and no sort.
+con.executescript("PRAGMA temp_store=MEMORY; PRAGMA mmap_size=268435456;")
 
 # Check the qualifying heat (1762616239)
 qual_heat_id = 1762616239
@@ -15,37 +38,39 @@ rows = con.execute("""
     FROM result_laps 
     WHERE race_id = ?
     ORDER BY entrant_id, lap_no
-""", (qual_heat_id,)).fetchall()
+""", (qual_heat_id,))
 
-if rows:
-    # Group by entrant
-    by_entrant = {}
-    for r in rows:
-        eid = r['entrant_id']
-        if eid not in by_entrant:
-            by_entrant[eid] = []
-        by_entrant[eid].append(r['lap_ms'])
-    
-    print(f"\n{'Entrant':<10} {'All Laps (ms)':<50} {'Best':<10} {'Best_s'}")
-    print("-" * 100)
-    
-    results = []
-    for eid, laps in sorted(by_entrant.items()):
-        best_ms = min(laps)
-        best_s = round(best_ms / 1000.0, 3)
-        laps_str = ', '.join([str(ms) for ms in laps[:10]])  # First 10 laps
-        if len(laps) > 10:
-            laps_str += f", ... ({len(laps)} total)"
-        print(f"{eid:<10} {laps_str:<50} {best_ms:<10} {best_s}")
-        results.append((eid, best_ms, best_s))
-    
+# Rows arrive grouped by entrant, so stream them: one pass, no per-entrant lists
+results = []
+for eid, grp in groupby(rows, key=itemgetter('entrant_id')):
+    if not results:
+        print(f"\n{'Entrant':<10} {'All Laps (ms)':<50} {'Best':<10} {'Best_s'}")
+        print("-" * 100)
+    shown = []  # first 10 laps
+    best_ms = None
+    total = 0
+    for r in grp:
+        ms = r['lap_ms']
+        total += 1
+        if total <= 10:
+            shown.append(str(ms))
+        if best_ms is None or ms < best_ms:
+            best_ms = ms
+    best_s = round(best_ms / 1000.0, 3)
+    laps_str = ', '.join(shown)
+    if total > 10:
+        laps_str += f", ... ({total} total)"
+    print(f"{eid:<10} {laps_str:<50} {best_ms:<10} {best_s}")
+    results.append((eid, best_ms, best_s))
+
+if results:
     print("\n" + "=" * 100)
     print("SORTED BY BEST LAP (how qualifying SHOULD be sorted)")
     print("=" * 100)
     print(f"{'Pos':<6} {'Entrant':<10} {'Best_ms':<10} {'Best_s'}")
     print("-" * 100)
     
-    results.sort(key=lambda x: x[1])  # Sort by best_ms
+    results.sort(key=itemgetter(1))  # Sort by best_ms
     for i, (eid, best_ms, best_s) in enumerate(results, 1):
         print(f"{i:<6} {eid:<10} {best_ms:<10} {best_s}")
     
@@ -54,19 +79,8 @@ if rows:
     print("=" * 100)
     print("Order  Entrant    Best_ms      Best_s")
     print("-" * 100)
-    print("1      4          20610        20.61")
-    print("2      3          20619        20.619")
-    print("3      15         20901        20.901")
-    print("4      5          21345        21.345")
-    print("5      6          21362        21.362")
-    print("6      14         22070        22.07")
-    print("7      7          22644        22.644")
-    print("8      12         23168        23.168")
-    print("9      9          23445        23.445")
-    print("10     10         26223        26.223")
-    print("11     8          27760        27.76")
-    print("12     2          29063        29.063")
-    print("13     11         22744        22.744  (brake fail - demoted)")
+    for order, ent, ms, sec, note in _ACTUAL_GRID:
+        print(f"{order:<7}{ent:<11}{ms:<13}{sec}{'  ' + note if note else ''}")
     
 else:
     print("No laps found for this heat")
@@ -1,7 +1,12 @@
 import sqlite3
-import json
 
-con = sqlite3.connect('backend/db/laps.sqlite')
+try:
+    from orjson import loads as _loads  # optional: faster parse of large event configs
+except ImportError:
+    from json import loads as _loads
+
+con = sqlite3.connect('file:backend/db/laps.sqlite?mode=ro', uri=True)
+con.execute("PRAGMA query_only=1")
 con.row_factory = sqlite3.Row
 
 # Get the latest event config
@@ -9,7 +14,7 @@ row = con.execute("SELECT event_id, config_json FROM events ORDER BY event_id DE
 
 if row:
     event_id = row['event_id']
-    config = json.loads(row['config_json']) if row['config_json'] else {}
+    config = _loads(row['config_json']) if row['config_json'] else {}
     
     qual = config.get('qualifying')
     
@@ -1,13 +1,29 @@
-from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc_server import BlockingOSCUDPServer
+import select
+import socket
+from pythonosc import osc_packet
 
 def dump(addr, *args):
     print(f"{addr} {args}")
 
-disp = Dispatcher()
-disp.set_default_handler(dump)
-
 # listen on the feedback port you set in QLC (step 1)
-server = BlockingOSCUDPServer(("127.0.0.1", 9010), disp)
+sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+sock.bind(("127.0.0.1", 9010))
 print("listening on 127.0.0.1:9010 ...")
-server.serve_forever()
+
+# decode each datagram in place; no per-packet handler objects. The short
+# select() timeout lets Ctrl-C through on Windows, where recvfrom won't wake.
+try:
+    while True:
+        if not select.select([sock], [], [], 0.5)[0]:
+            continue
+        data, _ = sock.recvfrom(65535)
+        try:
+            pkt = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            continue  # not OSC; the server version dropped these too
+        for m in pkt.messages:
+            dump(m.message.address, *m.message.params)
+except KeyboardInterrupt:
+    pass
+finally:
+    sock.close()
@@ -1,15 +1,18 @@
-import asyncio, sys
-from pythonosc.asyncio import AsyncIOOSCUDPClient
+import socket, sys
+from pythonosc.osc_message_builder import OscMessageBuilder
 
-async def main():
+def main():
     addr  = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
     port  = int(sys.argv[2]) if len(sys.argv) > 2 else 9000
     path  = sys.argv[3] if len(sys.argv) > 3 else "/ccrs/flag/green"
     value = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
 
-    client = AsyncIOOSCUDPClient(addr, port)
-    await client.send_message(path, value)
+    # one fire-and-forget datagram: build it and send it, no client or event loop
+    msg = OscMessageBuilder(address=path)
+    msg.add_arg(value)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(msg.build().dgram, (addr, port))
     print(f"sent {path} {value} -> {addr}:{port}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -1,11 +1,29 @@
-import sys
-from pythonosc.udp_client import SimpleUDPClient
+import socket, sys
+from pythonosc.osc_message_builder import OscMessageBuilder
 
-addr  = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
-port  = int(sys.argv[2]) if len(sys.argv) > 2 else 9000
-path  = sys.argv[3] if len(sys.argv) > 3 else "/ccrs/flag/green"
-value = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+def build(path, value):
+    """Encode one OSC message with a single float argument into datagram bytes."""
+    msg = OscMessageBuilder(address=path)
+    msg.add_arg(float(value))
+    return msg.build().dgram
 
-client = SimpleUDPClient(addr, port)
-client.send_message(path, value)
-print(f"sent {path} {value} -> {addr}:{port}")
\ No newline at end of file
+def send(addr, port, path, value):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(build(path, value), (addr, port))
+
+def send_many(addr, port, msgs):
+    """Send (path, value) pairs in order: all encoded up front, then one socket for every sendto."""
+    dgrams = [build(path, value) for path, value in msgs]
+    dest = (addr, port)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for dgram in dgrams:
+            sock.sendto(dgram, dest)
+
+if __name__ == "__main__":
+    addr  = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    port  = int(sys.argv[2]) if len(sys.argv) > 2 else 9000
+    path  = sys.argv[3] if len(sys.argv) > 3 else "/ccrs/flag/green"
+    value = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+
+    send(addr, port, path, value)
+    print(f"sent {path} {value} -> {addr}:{port}")